@@ -1,132 +1,349 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import base64
 import json
+import random
 import csv
 import io
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- GitHub API Setup ---
 GITHUB_TOKEN = st.secrets["github_token"]
 REPO = st.secrets["repo"]
 BRANCH = st.secrets.get("branch", "main")
 
+CLEANUP_INTERVAL = 5 * 60
+FETCH_TTL = 30
+REQUEST_TIMEOUT = 10
+SAVE_ATTEMPTS = 3
+SAVE_BACKOFF = 0.1
+SEARCH_FIELDS = ("message", "query")
+
 HEADERS = {
     "Authorization": f"token {GITHUB_TOKEN}",
     "Accept": "application/vnd.github.v3+json"
 }
 
-def get_file_content(path):
+@st.cache_resource
+def github_session():
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    # Shared by every browser session in the process, so the adapter keeps its default pool
+    # size (10) rather than one sized for a single rerun's two parallel requests.
+    # Only GETs are retried on gateway errors; a retried PUT could land twice.
+    retries = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False
+    )
+    session.mount("https://", HTTPAdapter(max_retries=retries))
+    return session
+
+@st.cache_resource
+def file_cache():
+    # path -> {"etag", "data_bytes", "sha"}; shared by every session in the process
+    return {}
+
+def fetch_file(session, path, cached):
     url = f"https://api.github.com/repos/{REPO}/contents/{path}?ref={BRANCH}"
-    r = requests.get(url, headers=HEADERS)
-    if r.status_code == 200:
+    headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else None
+    return session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+
+def read_file_response(path, r):
+    etag_cache = file_cache()
+    if r.status_code == 304:
+        cached = etag_cache[path]
+        return cached["data_bytes"], cached["sha"]
+    elif r.status_code == 200:
         content = r.json()
         sha = content["sha"]
-        file_data = base64.b64decode(content["content"]).decode()
+        file_data = base64.b64decode(content["content"])
+        etag = r.headers.get("ETag")
+        if etag:
+            etag_cache[path] = {"etag": etag, "data_bytes": file_data, "sha": sha}
         return file_data, sha
     elif r.status_code == 404:
-        return "[]", None
+        return b"[]", None
     else:
         st.error(f"Error fetching {path} from GitHub: {r.status_code}")
         st.stop()
 
-def update_file_content(path, data_str, sha, commit_message):
-    url = f"https://api.github.com/repos/{REPO}/contents/{path}"
-    encoded_content = base64.b64encode(data_str.encode()).decode()
+@st.cache_data(ttl=FETCH_TTL, show_spinner=False)
+def get_files_content(paths):
+    # Only the HTTP requests run in worker threads; Streamlit state is touched here
+    etag_cache = file_cache()
+    session = github_session()
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        futures = [executor.submit(fetch_file, session, path, etag_cache.get(path)) for path in paths]
+    results = []
+    for path, future in zip(paths, futures):
+        try:
+            r = future.result()
+        except requests.RequestException as e:
+            st.error(f"Error fetching {path} from GitHub: {e}")
+            st.stop()
+        results.append(read_file_response(path, r))
+    return results
+
+def build_put_payload(data_bytes, sha, commit_message):
     payload = {
         "message": commit_message,
-        "content": encoded_content,
+        "content": base64.b64encode(data_bytes).decode("ascii"),
         "branch": BRANCH
     }
     if sha:
         payload["sha"] = sha
-    r = requests.put(url, headers=HEADERS, json=payload)
+    return payload
+
+def put_file(session, path, payload):
+    url = f"https://api.github.com/repos/{REPO}/contents/{path}"
+    # Serialized with json_dumps (orjson when available) instead of requests' stdlib json=
+    return session.put(
+        url, data=json_dumps(payload), headers={"Content-Type": "application/json"}, timeout=REQUEST_TIMEOUT
+    )
+
+def read_put_response(path, r, data_bytes):
     if r.status_code in [200, 201]:
-        return True
+        sha = r.json()["content"]["sha"]
+        # The PUT response ETag doesn't validate the contents GET, so keep the body without one
+        file_cache()[path] = {"etag": None, "data_bytes": data_bytes, "sha": sha}
+        get_files_content.clear()
+        return sha
     else:
         st.error(f"Error updating {path} on GitHub: {r.status_code} {r.text}")
-        return False
-
-def load_feedback():
-    data_str, sha = get_file_content("feedback.json")
-    feedback_list = json.loads(data_str)
-    for fb in feedback_list:
-        if "replies" not in fb:
-            fb["replies"] = []
-    return feedback_list, sha
-
-def load_tickets():
-    data_str, sha = get_file_content("tickets.json")
-    tickets_list = json.loads(data_str)
-    for tk in tickets_list:
-        if "replies" not in tk:
-            tk["replies"] = []
-    return tickets_list, sha
-
-def save_feedback(feedback_list, sha):
-    data_str = json.dumps(feedback_list, indent=2)
-    return update_file_content("feedback.json", data_str, sha, "Update feedback data")
-
-def save_tickets(tickets_list, sha):
-    data_str = json.dumps(tickets_list, indent=2)
-    return update_file_content("tickets.json", data_str, sha, "Update tickets data")
+        return None
+
+def unchanged_on_github(path, data_bytes, sha):
+    cached = file_cache().get(path)
+    return cached is not None and cached["sha"] == sha and cached["data_bytes"] == data_bytes
+
+def update_files_content(updates, conflicts=None):
+    # updates: (path, data_bytes, sha, commit_message); one commit per file, sent in parallel.
+    # With a conflicts set, 409s (file changed since sha) are collected there instead of reported.
+    results = {}
+    pending = []
+    for path, data_bytes, sha, message in updates:
+        if unchanged_on_github(path, data_bytes, sha):
+            results[path] = sha
+        else:
+            pending.append((path, data_bytes, build_put_payload(data_bytes, sha, message)))
+    if pending:
+        session = github_session()
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = [executor.submit(put_file, session, path, payload) for path, _, payload in pending]
+        # Each PUT is settled on its own, so one file failing never drops another's success
+        for (path, data_bytes, _), future in zip(pending, futures):
+            try:
+                r = future.result()
+            except requests.RequestException as e:
+                st.error(f"Error updating {path} on GitHub: {e}")
+                results[path] = None
+                continue
+            if r.status_code == 409 and conflicts is not None:
+                conflicts.add(path)
+                results[path] = None
+            else:
+                results[path] = read_put_response(path, r, data_bytes)
+    return [results[update[0]] for update in updates]
+
+def save_files(updates):
+    # updates: (path, items, sha, commit_message, rebase). After a 409 the file is reloaded and
+    # rebase(latest_items, latest_sha) re-applies this save's change before retrying with backoff.
+    # Returns (sha, items) per path: the items actually written, which differ from the input after
+    # a rebase. sha is None when the save failed.
+    paths = [update[0] for update in updates]
+    results = {}
+    delay = SAVE_BACKOFF
+    for attempt in range(SAVE_ATTEMPTS):
+        conflicts = set() if attempt < SAVE_ATTEMPTS - 1 else None
+        shas = update_files_content(
+            [(path, serialize_items(items), sha, message) for path, items, sha, message, _ in updates],
+            conflicts
+        )
+        results.update((update[0], (sha, update[1])) for update, sha in zip(updates, shas))
+        updates = [update for update in updates if conflicts and update[0] in conflicts]
+        if not updates:
+            break
+        time.sleep(random.uniform(delay, delay * 2))
+        delay *= 4
+        get_files_content.clear()
+        latest = get_files_content([update[0] for update in updates])
+        updates = [
+            (path, rebase(parse_items(path, sha, data), sha), sha, message, rebase)
+            for (path, _, _, message, rebase), (data, sha) in zip(updates, latest)
+        ]
+    return [results[path] for path in paths]
+
+def json_loads(data):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def json_dumps(data):
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+def serialize_items(items):
+    # Underscore keys are derived at load time and never stored
+    return json_dumps([{k: v for k, v in item.items() if not k.startswith("_")} for item in items])
+
+def parse_timestamp(value):
+    return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp())
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def parse_items(path, sha, _data):
+    # Keyed on (path, sha) only; the blob itself is never hashed. Every save makes a new sha,
+    # so old versions are evicted (about four per file)
+    items = json_loads(_data)
+    for item in items:
+        if "replies" not in item:
+            item["replies"] = []
+        if "created_ts" not in item:
+            item["created_ts"] = parse_timestamp(item["created_at"])
+        search_blob(item)
+    # Newest first; every view relies on this order instead of re-sorting
+    items.sort(key=itemgetter("created_ts"), reverse=True)
+    return items
+
+def load_all():
+    (fb_data, fb_sha), (tk_data, tk_sha) = get_files_content(["feedback.json", "tickets.json"])
+    return (
+        (parse_items("feedback.json", fb_sha, fb_data), fb_sha),
+        (parse_items("tickets.json", tk_sha, tk_data), tk_sha),
+    )
+
+def save_feedback(feedback_list, sha, rebase):
+    return save_files([("feedback.json", feedback_list, sha, "Update feedback data", rebase)])[0]
+
+def save_tickets(tickets_list, sha, rebase):
+    return save_files([("tickets.json", tickets_list, sha, "Update tickets data", rebase)])[0]
+
+def insert_item(new_item):
+    # Rebase for a submission: put the new record on top of the latest list with a fresh id
+    def rebase(items, sha):
+        new_item["id"] = next_item_id(items)
+        return [new_item] + items
+    return rebase
 
 def remove_old_feedback(feedback_list):
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
-    filtered = [
-        fb for fb in feedback_list
-        if datetime.strptime(fb["created_at"], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc) > cutoff
-    ]
-    return filtered
+    cutoff = time.time() - 24 * 60 * 60
+    # Lists are newest first, so if the oldest item is still live nothing has expired,
+    # and otherwise everything from the first expired item onward is expired
+    if not feedback_list or feedback_list[-1]["created_ts"] > cutoff:
+        return feedback_list
+    for index, fb in enumerate(feedback_list):
+        if fb["created_ts"] <= cutoff:
+            return feedback_list[:index]
+    return feedback_list
 
 def generate_session_id():
     if "anon_session_id" not in st.session_state:
         st.session_state["anon_session_id"] = str(uuid.uuid4())
     return st.session_state["anon_session_id"]
 
-def filter_items(items, keyword, fields):
-    if not keyword:
-        return items
-    keyword_lower = keyword.lower()
-    filtered = []
-    for item in items:
-        for field in fields:
-            if field in item and keyword_lower in item[field].lower():
-                filtered.append(item)
-                break
-    return filtered
+def next_item_id(items):
+    return max((item["id"] for item in items), default=0) + 1
+
+def search_blob(item):
+    blob = item.get("_search")
+    if blob is None:
+        blob = item["_search"] = " ".join(item.get(field, "") for field in SEARCH_FIELDS).lower()
+    return blob
+
+def filter_items(items, keyword, limit):
+    # Matching stops once limit items are found
+    if keyword:
+        keyword_lower = keyword.lower()
+        items = (item for item in items if keyword_lower in search_blob(item))
+    return list(islice(items, limit))
 
 def paginate_items(items, page, page_size):
     start = page * page_size
     end = start + page_size
     return items[start:end], len(items) > end
 
+def queue_op(path, op, item_id, data=None):
+    st.session_state.setdefault("pending_ops", []).append({"path": path, "op": op, "id": item_id, "data": data})
+
+def apply_ops(items, ops):
+    if not ops:
+        return items
+    by_id = {item["id"]: item for item in items}
+    for entry in ops:
+        if entry["op"] == "delete":
+            by_id.pop(entry["id"], None)
+            continue
+        item = by_id.get(entry["id"])
+        if item is None:
+            continue
+        if entry["op"] == "edit":
+            item.update(entry["data"])
+            item.pop("_search", None)
+        elif entry["op"] == "reply":
+            # A reply whose save timed out may already be on GitHub; don't append it twice
+            reply_id = entry["data"].get("id")
+            if reply_id is None or all(reply.get("id") != reply_id for reply in item["replies"]):
+                item["replies"].append(entry["data"])
+    # dicts keep insertion order, so the newest-first order survives
+    return list(by_id.values())
+
+def admin_page_view(items, label, key, page_size=25):
+    # Keeps the admin widget count bounded regardless of how many records exist
+    pages = max(1, (len(items) + page_size - 1) // page_size)
+    page = min(int(st.number_input(label, min_value=1, step=1, key=key)), pages)
+    st.caption(f"Page {page} of {pages}")
+    return items[(page - 1) * page_size:page * page_size]
+
+def prune_pending_deletes(key, visible_items):
+    # Forget delete confirmations for records that are no longer on screen
+    pending = st.session_state[key]
+    if pending:
+        pending.intersection_update(item["id"] for item in visible_items)
+
 def convert_to_csv(data, fields):
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=fields)
-    writer.writeheader()
-    for row in data:
-        row_copy = row.copy()
-        row_copy["replies_count"] = len(row_copy.get("replies", []))
-        writer.writerow({k: row_copy.get(k, "") for k in fields})
-    return output.getvalue()
+    # Rows are written straight into one bytes buffer, which st.download_button takes as-is
+    buffer = io.BytesIO()
+    output = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    writer = csv.writer(output)
+    writer.writerow(fields)
+    writer.writerows(
+        [len(row.get("replies", [])) if k == "replies_count" else row.get(k, "") for k in fields]
+        for row in data
+    )
+    output.detach()
+    return buffer.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_csv(path, sha, ops_bytes, _items, fields):
+    # The rows are the file at sha with the serialized queued ops replayed on top
+    return convert_to_csv(_items, fields)
 
 # --- Initialize session state variables ---
-if "tickets_sha" not in st.session_state:
-    _, st.session_state["tickets_sha"] = load_tickets()
-if "logged_in" not in st.session_state:
-    st.session_state["logged_in"] = False
-if "login_error" not in st.session_state:
-    st.session_state["login_error"] = False
-if "feedback_page" not in st.session_state:
-    st.session_state["feedback_page"] = 0
-if "ticket_page" not in st.session_state:
-    st.session_state["ticket_page"] = 0
-if "feedback_search" not in st.session_state:
-    st.session_state["feedback_search"] = ""
-if "ticket_search" not in st.session_state:
-    st.session_state["ticket_search"] = ""
+SESSION_DEFAULTS = {
+    "logged_in": False,
+    "login_error": False,
+    "feedback_page": 0,
+    "ticket_page": 0,
+    "feedback_search": "",
+    "ticket_search": "",
+    "fb_pending_del": set(),
+    "tk_pending_del": set(),
+}
+for key, value in SESSION_DEFAULTS.items():
+    st.session_state.setdefault(key, value)
 
 # --- Streamlit UI ---
 
@@ -136,12 +353,21 @@ st.markdown("Submit your feedback or queries anonymously. Your identity remains
 
 anon_session_id = generate_session_id()
 
-feedback_list, feedback_sha = load_feedback()
-tickets_list, _ = load_tickets()
+(feedback_list, feedback_sha), (tickets_list, tickets_sha) = load_all()
 
+# Expired feedback is hidden on every run but only written back every few minutes
 new_feedback_list = remove_old_feedback(feedback_list)
 if len(new_feedback_list) < len(feedback_list):
-    save_feedback(new_feedback_list, feedback_sha)
+    now_ts = time.time()
+    if now_ts - st.session_state.get("last_cleanup_ts", 0) > CLEANUP_INTERVAL:
+        st.session_state["last_cleanup_ts"] = now_ts
+        saved_sha, saved_list = save_feedback(
+            new_feedback_list, feedback_sha, lambda items, sha: remove_old_feedback(items)
+        )
+        if saved_sha:
+            # After a conflict the saved list was rebuilt from the latest file, so use it rather
+            # than new_feedback_list, which lacks other sessions' records
+            feedback_sha, new_feedback_list = saved_sha, saved_list
     feedback_list = new_feedback_list
 
 # --- Sidebar Login/Logout with rerun inside handlers ---
@@ -181,14 +407,18 @@ with tab_public:
             if st.session_state.get("last_feedback_msg", "") == feedback_message.strip():
                 st.warning("You have already submitted this feedback in this session.")
             else:
+                now = datetime.now(timezone.utc)
                 new_fb = {
-                    "id": (max([fb["id"] for fb in feedback_list]) + 1) if feedback_list else 1,
+                    "id": next_item_id(feedback_list),
                     "message": feedback_message.strip(),
-                    "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+                    "created_at": now.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "created_ts": int(now.timestamp()),
                     "replies": []
                 }
-                feedback_list.append(new_fb)
-                if save_feedback(feedback_list, feedback_sha):
+                feedback_list.insert(0, new_fb)
+                saved_sha, saved_list = save_feedback(feedback_list, feedback_sha, insert_item(new_fb))
+                if saved_sha:
+                    feedback_sha, feedback_list = saved_sha, remove_old_feedback(saved_list)
                     st.success("✅ Feedback submitted successfully!")
                     st.session_state["last_feedback_msg"] = feedback_message.strip()
                 else:
@@ -207,14 +437,18 @@ with tab_public:
         on_change=reset_feedback_page,
         placeholder="Type to search feedback..."
     )
-    filtered_feedback = filter_items(feedback_list, st.session_state.feedback_search, ["message"])
     page_size = 5
     feedback_page = st.session_state.feedback_page
+    # One extra match is enough for paginate_items to know whether there is a next page
+    filtered_feedback = filter_items(
+        feedback_list, st.session_state.feedback_search, (feedback_page + 1) * page_size + 1
+    )
     page_items, has_more = paginate_items(filtered_feedback, feedback_page, page_size)
 
     if page_items:
-        for fb in sorted(page_items, key=lambda x: x["created_at"], reverse=True):
-            with st.expander(f"Feedback #{fb['id']} (Submitted: {fb['created_at']} UTC)"):
+        for fb in page_items:
+            # Collapsed items only send their header; the body is built once opened
+            if st.checkbox(f"Feedback #{fb['id']} (Submitted: {fb['created_at']} UTC)", key=f"fb_open_{fb['id']}"):
                 st.write(fb["message"])
                 if fb.get("replies"):
                     st.markdown("**Admin Replies:**")
@@ -237,20 +471,25 @@ with tab_public:
             if st.session_state.get("last_ticket_msg", "") == ticket_query.strip():
                 st.warning("You have already submitted this ticket in this session.")
             else:
-                new_id = (max([t["id"] for t in tickets_list]) + 1) if tickets_list else 1
+                new_id = next_item_id(tickets_list)
+                now = datetime.now(timezone.utc)
+                now_str = now.strftime("%Y-%m-%dT%H:%M:%S")
                 new_ticket = {
                     "id": new_id,
                     "query": ticket_query.strip(),
                     "status": "In Process",
-                    "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
-                    "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+                    "created_at": now_str,
+                    "created_ts": int(now.timestamp()),
+                    "updated_at": now_str,
                     "replies": []
                 }
-                tickets_list.append(new_ticket)
-                if save_tickets(tickets_list, st.session_state["tickets_sha"]):
+                tickets_list.insert(0, new_ticket)
+                new_sha, saved_list = save_tickets(
+                    tickets_list, tickets_sha, insert_item(new_ticket)
+                )
+                if new_sha:
                     st.success("✅ Ticket submitted successfully!")
-                    _, new_sha = load_tickets()
-                    st.session_state["tickets_sha"] = new_sha
+                    tickets_sha, tickets_list = new_sha, saved_list
                     st.session_state["last_ticket_msg"] = ticket_query.strip()
                 else:
                     st.error("❌ Failed to save ticket.")
@@ -268,20 +507,25 @@ with tab_public:
         on_change=reset_ticket_page,
         placeholder="Type to search tickets..."
     )
-    filtered_tickets = filter_items(tickets_list, st.session_state.ticket_search, ["query"])
+    # Completed tickets are dropped before paging so they don't leave holes in a page
+    open_tickets = (t for t in tickets_list if t["status"] != "Completed")
     ticket_page = st.session_state.ticket_page
+    filtered_tickets = filter_items(open_tickets, st.session_state.ticket_search, (ticket_page + 1) * page_size + 1)
     page_items, has_more = paginate_items(filtered_tickets, ticket_page, page_size)
 
     if page_items:
-        for ticket in sorted(page_items, key=lambda x: x["created_at"], reverse=True):
-            if ticket["status"] != "Completed":
-                with st.expander(f"Ticket #{ticket['id']} - {ticket['status']} (Created: {ticket['created_at']} UTC)"):
-                    st.write(f"**Query:** {ticket['query']}")
-                    st.write(f"Last Updated: {ticket['updated_at']} UTC")
-                    if ticket.get("replies"):
-                        st.markdown("**Admin Replies:**")
-                        for reply in ticket["replies"]:
-                            st.markdown(f"- {reply['message']} (at {reply['created_at']} UTC)")
+        for ticket in page_items:
+            # Same as feedback: the body is only built for tickets that are opened
+            if st.checkbox(
+                f"Ticket #{ticket['id']} - {ticket['status']} (Created: {ticket['created_at']} UTC)",
+                key=f"tk_open_{ticket['id']}"
+            ):
+                st.write(f"**Query:** {ticket['query']}")
+                st.write(f"Last Updated: {ticket['updated_at']} UTC")
+                if ticket.get("replies"):
+                    st.markdown("**Admin Replies:**")
+                    for reply in ticket["replies"]:
+                        st.markdown(f"- {reply['message']} (at {reply['created_at']} UTC)")
     else:
         st.write("No tickets submitted yet.")
 
@@ -293,64 +537,92 @@ if st.session_state["logged_in"]:
     with tab_admin:
         st.header("🛠️ Admin Panel - Manage Feedback and Tickets")
 
-        feedback_list, feedback_sha = load_feedback()
-        tickets_list, tickets_sha = load_tickets()
-        st.session_state["tickets_sha"] = tickets_sha
+        (feedback_list, feedback_sha), (tickets_list, tickets_sha) = load_all()
+        
+        # Admin edits are queued and replayed on the latest data until applied in one save per file
+        pending_ops = st.session_state.setdefault("pending_ops", [])
+        feedback_ops = [op for op in pending_ops if op["path"] == "feedback.json"]
+        tickets_ops = [op for op in pending_ops if op["path"] == "tickets.json"]
+        feedback_list = apply_ops(feedback_list, feedback_ops)
+        tickets_list = apply_ops(tickets_list, tickets_ops)
+
+        if pending_ops:
+            st.info(f"{len(pending_ops)} pending change(s) not yet saved to GitHub.")
+            col_apply, col_discard = st.columns(2)
+            with col_apply:
+                if st.button("Apply All Changes"):
+                    updates = []
+                    for path, items, sha, message in (
+                        ("feedback.json", feedback_list, feedback_sha, "Update feedback data"),
+                        ("tickets.json", tickets_list, tickets_sha, "Update tickets data"),
+                    ):
+                        ops = [op for op in pending_ops if op["path"] == path]
+                        if ops:
+                            updates.append((path, items, sha, message, lambda latest, _, ops=ops: apply_ops(latest, ops)))
+                    results = save_files(updates)
+                    failed = {update[0] for update, (new_sha, _) in zip(updates, results) if not new_sha}
+                    remaining = [op for op in pending_ops if op["path"] in failed]
+                    st.session_state["pending_ops"] = remaining
+                    if not remaining:
+                        st.success("✅ All changes saved.")
+                        st.experimental_rerun()
+            with col_discard:
+                if st.button("Discard Changes"):
+                    st.session_state["pending_ops"] = []
+                    st.experimental_rerun()
 
         st.subheader("Export Data")
         if st.button("Export Feedback as CSV"):
-            csv_data = convert_to_csv(feedback_list, ["id", "message", "created_at", "replies_count"])
+            csv_data = export_csv(
+                "feedback.json", feedback_sha, json_dumps(feedback_ops), feedback_list,
+                ["id", "message", "created_at", "replies_count"]
+            )
             st.download_button("Download Feedback CSV", csv_data, "feedback.csv", "text/csv")
         if st.button("Export Tickets as CSV"):
-            csv_data = convert_to_csv(tickets_list, ["id", "query", "status", "created_at", "updated_at", "replies_count"])
+            csv_data = export_csv(
+                "tickets.json", tickets_sha, json_dumps(tickets_ops), tickets_list,
+                ["id", "query", "status", "created_at", "updated_at", "replies_count"]
+            )
             st.download_button("Download Tickets CSV", csv_data, "tickets.csv", "text/csv")
 
         st.markdown("---")
 
         st.subheader("Feedback Management")
         if feedback_list:
-            for fb in sorted(feedback_list, key=lambda x: x["created_at"], reverse=True):
-                with st.expander(f"Feedback #{fb['id']} (Submitted: {fb['created_at']} UTC)", expanded=False):
-                    edited_message = st.text_area("Edit feedback message:", fb["message"], key=f"fb_edit_{fb['id']}")
+            fb_page_items = admin_page_view(feedback_list, "Feedback page", "admin_fb_page")
+            prune_pending_deletes("fb_pending_del", fb_page_items)
+            fb_pending_del = st.session_state["fb_pending_del"]
+            for fb in fb_page_items:
+                fb_id = fb["id"]
+                with st.expander(f"Feedback #{fb_id} (Submitted: {fb['created_at']} UTC)", expanded=False):
+                    edited_message = st.text_area("Edit feedback message:", fb["message"], key=f"fb_edit_{fb_id}")
                     col1, col2, col3 = st.columns([1,1,2])
                     with col1:
-                        if st.button("Save Feedback", key=f"fb_save_{fb['id']}"):
-                            fb["message"] = edited_message.strip()
-                            if save_feedback(feedback_list, feedback_sha):
-                                st.success("✅ Feedback saved.")
-                                st.experimental_rerun()
-                            else:
-                                st.error("❌ Failed to save feedback.")
+                        if st.button("Save Feedback", key=f"fb_save_{fb_id}"):
+                            queue_op("feedback.json", "edit", fb_id, {"message": edited_message.strip()})
+                            st.experimental_rerun()
                     with col2:
-                        delete_key = f"fb_del_confirm_{fb['id']}"
-                        if st.session_state.get(delete_key, False):
-                            if st.button(f"Confirm Delete Feedback #{fb['id']}", key=f"fb_del_confirm_btn_{fb['id']}"):
-                                feedback_list = [f for f in feedback_list if f["id"] != fb["id"]]
-                                st.session_state[delete_key] = False
-                                if save_feedback(feedback_list, feedback_sha):
-                                    st.success("✅ Feedback deleted.")
-                                    st.experimental_rerun()
-                                else:
-                                    st.error("❌ Failed to delete feedback.")
+                        if fb_id in fb_pending_del:
+                            if st.button(f"Confirm Delete Feedback #{fb_id}", key=f"fb_del_confirm_btn_{fb_id}"):
+                                fb_pending_del.discard(fb_id)
+                                queue_op("feedback.json", "delete", fb_id)
+                                st.experimental_rerun()
                         else:
-                            if st.button(f"Delete Feedback #{fb['id']}", key=f"fb_del_{fb['id']}"):
-                                st.session_state[delete_key] = True
+                            if st.button(f"Delete Feedback #{fb_id}", key=f"fb_del_{fb_id}"):
+                                fb_pending_del.add(fb_id)
                     with col3:
-                        with st.form(f"fb_reply_form_{fb['id']}"):
-                            reply_text = st.text_area("Write a reply to this feedback:", key=f"fb_reply_text_{fb['id']}", height=80)
+                        with st.form(f"fb_reply_form_{fb_id}"):
+                            reply_text = st.text_area("Write a reply to this feedback:", key=f"fb_reply_text_{fb_id}", height=80)
                             submitted_reply = st.form_submit_button("Submit Reply")
                             if submitted_reply:
                                 if reply_text.strip():
                                     reply = {
+                                        "id": uuid.uuid4().hex,
                                         "message": reply_text.strip(),
                                         "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
                                     }
-                                    fb.setdefault("replies", []).append(reply)
-                                    if save_feedback(feedback_list, feedback_sha):
-                                        st.success("✅ Reply saved.")
-                                        st.experimental_rerun()
-                                    else:
-                                        st.error("❌ Failed to save reply.")
+                                    queue_op("feedback.json", "reply", fb_id, reply)
+                                    st.experimental_rerun()
                                 else:
                                     st.error("❌ Reply cannot be empty.")
         else:
@@ -360,60 +632,50 @@ if st.session_state["logged_in"]:
 
         st.subheader("Ticket Management")
         if tickets_list:
-            for ticket in sorted(tickets_list, key=lambda x: x["created_at"], reverse=True):
-                with st.expander(f"Ticket #{ticket['id']} - {ticket['status']} (Created: {ticket['created_at']} UTC)", expanded=False):
-                    edited_query = st.text_area("Edit ticket query:", ticket["query"], key=f"tk_edit_{ticket['id']}")
-                    new_status = st.selectbox("Update Status:", ["In Process", "Completed"], index=0 if ticket["status"]=="In Process" else 1, key=f"tk_status_{ticket['id']}")
+            ticket_page_items = admin_page_view(tickets_list, "Ticket page", "admin_ticket_page")
+            prune_pending_deletes("tk_pending_del", ticket_page_items)
+            tk_pending_del = st.session_state["tk_pending_del"]
+            for ticket in ticket_page_items:
+                ticket_id = ticket["id"]
+                with st.expander(f"Ticket #{ticket_id} - {ticket['status']} (Created: {ticket['created_at']} UTC)", expanded=False):
+                    edited_query = st.text_area("Edit ticket query:", ticket["query"], key=f"tk_edit_{ticket_id}")
+                    new_status = st.selectbox("Update Status:", ["In Process", "Completed"], index=0 if ticket["status"]=="In Process" else 1, key=f"tk_status_{ticket_id}")
                     col1, col2, col3, col4 = st.columns([1,1,1,2])
                     with col1:
-                        if st.button("Save Ticket", key=f"tk_save_{ticket['id']}"):
-                            ticket["query"] = edited_query.strip()
-                            ticket["status"] = new_status
-                            ticket["updated_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
-                            if save_tickets(tickets_list, tickets_sha):
-                                st.success("✅ Ticket saved.")
-                                st.experimental_rerun()
-                            else:
-                                st.error("❌ Failed to save ticket.")
+                        if st.button("Save Ticket", key=f"tk_save_{ticket_id}"):
+                            queue_op("tickets.json", "edit", ticket_id, {
+                                "query": edited_query.strip(),
+                                "status": new_status,
+                                "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+                            })
+                            st.experimental_rerun()
                     with col2:
-                        delete_key = f"tk_del_confirm_{ticket['id']}"
-                        if st.session_state.get(delete_key, False):
-                            if st.button(f"Confirm Delete Ticket #{ticket['id']}", key=f"tk_del_confirm_btn_{ticket['id']}"):
-                                tickets_list = [t for t in tickets_list if t["id"] != ticket["id"]]
-                                st.session_state[delete_key] = False
-                                if save_tickets(tickets_list, tickets_sha):
-                                    st.success("✅ Ticket deleted.")
-                                    st.experimental_rerun()
-                                else:
-                                    st.error("❌ Failed to delete ticket.")
+                        if ticket_id in tk_pending_del:
+                            if st.button(f"Confirm Delete Ticket #{ticket_id}", key=f"tk_del_confirm_btn_{ticket_id}"):
+                                tk_pending_del.discard(ticket_id)
+                                queue_op("tickets.json", "delete", ticket_id)
+                                st.experimental_rerun()
                         else:
-                            if st.button(f"Delete Ticket #{ticket['id']}", key=f"tk_del_{ticket['id']}"):
-                                st.session_state[delete_key] = True
+                            if st.button(f"Delete Ticket #{ticket_id}", key=f"tk_del_{ticket_id}"):
+                                tk_pending_del.add(ticket_id)
                     with col3:
                         if new_status == "Completed":
-                            if st.button("Mark Completed & Remove", key=f"tk_comp_{ticket['id']}"):
-                                tickets_list = [t for t in tickets_list if t["id"] != ticket["id"]]
-                                if save_tickets(tickets_list, tickets_sha):
-                                    st.success("✅ Ticket marked completed and removed from public view.")
-                                    st.experimental_rerun()
-                                else:
-                                    st.error("❌ Failed to update ticket.")
+                            if st.button("Mark Completed & Remove", key=f"tk_comp_{ticket_id}"):
+                                queue_op("tickets.json", "delete", ticket_id)
+                                st.experimental_rerun()
                     with col4:
-                        with st.form(f"tk_reply_form_{ticket['id']}"):
-                            reply_text = st.text_area("Write a reply to this ticket:", key=f"tk_reply_text_{ticket['id']}", height=80)
+                        with st.form(f"tk_reply_form_{ticket_id}"):
+                            reply_text = st.text_area("Write a reply to this ticket:", key=f"tk_reply_text_{ticket_id}", height=80)
                             submitted_reply = st.form_submit_button("Submit Reply")
                             if submitted_reply:
                                 if reply_text.strip():
                                     reply = {
+                                        "id": uuid.uuid4().hex,
                                         "message": reply_text.strip(),
                                         "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
                                     }
-                                    ticket.setdefault("replies", []).append(reply)
-                                    if save_tickets(tickets_list, tickets_sha):
-                                        st.success("✅ Reply saved.")
-                                        st.experimental_rerun()
-                                    else:
-                                        st.error("❌ Failed to save reply.")
+                                    queue_op("tickets.json", "reply", ticket_id, reply)
+                                    st.experimental_rerun()
                                 else:
                                     st.error("❌ Reply cannot be empty.")
         else: